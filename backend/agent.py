@@ -1,27 +1,21 @@
+import asyncio
+import importlib.util
+import threading
+from typing import Optional
+
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from settings import logger, OPENAI_API_KEY
 
-# Initialize the ChatOpenAI model
-chat_model = ChatOpenAI(
-    model="gpt-5-2025-08-07",
-    temperature=1,
-    api_key=OPENAI_API_KEY
-)
+# Caps concurrent LLM calls (e.g. one per search result) to stay under rate limits
+_llm_semaphore = asyncio.Semaphore(8)
 
-def generate_response(query: str, title: str, snippet: str) -> str:
-    """
-    Generate a helpful response to the user's query based on the video snippet.
-
-    Args:
-        query: The user's search query
-        title: The title of the video
-        snippet: The transcript snippet from the video
+# Shown in place of an AI response when the LLM call fails
+FALLBACK_RESPONSE = "I couldn't generate a response for this result. Please check the snippet for relevant information."
 
-    Returns:
-        A generated response that answers the query and explains the context
-    """
-    system_prompt = """
+# The system prompt never changes, so build its message once
+SYSTEM_MESSAGE = SystemMessage(content="""
     You are a helpful AI assistant that explains video content to users. Your task is to:
 
     1. Generate a concise, helpful response that directly answers the user's question based on the video snippet.
@@ -34,9 +28,9 @@ def generate_response(query: str, title: str, snippet: str) -> str:
     DO NOT mention that you're an AI or that you're analyzing a transcript.
     DO NOT apologize or use phrases like "Based on the snippet provided".
     DO speak as if you're explaining why this video segment answers their question.
-    """
+    """)
 
-    human_prompt = f"""
+HUMAN_PROMPT_TEMPLATE = """
     User question: {query}
 
     Video title: {title}
@@ -44,14 +38,81 @@ def generate_response(query: str, title: str, snippet: str) -> str:
     Video snippet: {snippet}
     """
 
+
+_chat_model: Optional[ChatOpenAI] = None
+_chat_model_lock = threading.Lock()
+
+
+def _get_chat_model() -> ChatOpenAI:
+    """
+    Build the ChatOpenAI model on first use so routes that never call the LLM
+    don't pay for it at cold start. Thread-safe, so concurrent first calls from
+    worker threads share one model.
+    """
+    global _chat_model
+    if _chat_model is None:
+        with _chat_model_lock:
+            if _chat_model is None:
+                _chat_model = _build_chat_model()
+    return _chat_model
+
+
+def _build_chat_model() -> ChatOpenAI:
+    """
+    Uses shared keep-alive HTTP/2 clients so LLM calls reuse pooled connections
+    instead of paying DNS + TLS setup every request.
+    """
+    http_limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    # httpx only supports HTTP/2 with the optional h2 package installed
+    http2 = importlib.util.find_spec("h2") is not None
+    if not http2:
+        logger.warning("h2 is not installed; LLM HTTP clients will use HTTP/1.1")
+    return ChatOpenAI(
+        model="gpt-5-2025-08-07",
+        temperature=1,
+        api_key=OPENAI_API_KEY,
+        http_client=httpx.Client(http2=http2, limits=http_limits, timeout=30),
+        http_async_client=httpx.AsyncClient(http2=http2, limits=http_limits, timeout=30)
+    )
+
+
+async def close_http_clients():
+    """Close the shared LLM HTTP clients, if they were ever created; called on app shutdown."""
+    global _chat_model
+    chat_model, _chat_model = _chat_model, None
+    if chat_model is None:
+        return
+    chat_model.http_client.close()
+    await chat_model.http_async_client.aclose()
+
+async def generate_response(query: str, title: str, snippet: str) -> str:
+    """
+    Generate a helpful response to the user's query based on the video snippet.
+
+    Args:
+        query: The user's search query
+        title: The title of the video
+        snippet: The transcript snippet from the video
+
+    Returns:
+        A generated response that answers the query and explains the context
+
+    Raises:
+        Any error from the LLM call; callers show FALLBACK_RESPONSE instead
+    """
+    human_prompt = HUMAN_PROMPT_TEMPLATE.format(query=query, title=title, snippet=snippet)
+
     messages = [
-        SystemMessage(content=system_prompt),
+        SYSTEM_MESSAGE,
         HumanMessage(content=human_prompt)
     ]
 
     try:
-        response = chat_model.invoke(messages)
+        # The first call builds the model and its HTTP clients, so keep it off the event loop
+        chat_model = _chat_model or await asyncio.to_thread(_get_chat_model)
+        async with _llm_semaphore:
+            response = await chat_model.ainvoke(messages)
         return response.content
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}")
-        return "I couldn't generate a response for this result. Please check the snippet for relevant information."
\ No newline at end of file
+        raise
\ No newline at end of file
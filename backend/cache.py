@@ -0,0 +1,109 @@
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+
+from settings import (
+    logger, DEBUG_LOGGING,
+    SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_MAXSIZE, SEMANTIC_CACHE_INGEST_GRACE
+)
+
+
+class SemanticCache:
+    """
+    Caches values keyed by query embedding, so rephrasings of a recent query
+    return the stored value instead of going back to Pinecone and the LLM.
+
+    Embeddings are kept as rows of one unit-vector matrix. A lookup is a single
+    matmul against every unexpired row and hits if the best cosine similarity
+    is >= threshold. When full, the slot with the earliest expiry is reused:
+    an expired entry if there is one, otherwise the oldest.
+
+    Memory is about maxsize * dim * 4 bytes (~12 KB per entry for 3072-dim
+    embeddings); rows are allocated as the cache fills, not up front.
+
+    clear() bumps `generation`. Callers read it before computing a value and
+    pass it to set(), which drops values computed against an older generation,
+    or stored within `ingest_grace` seconds of a clear while new vectors may not
+    be searchable yet.
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 2000, ttl: int = 3600,
+                 ingest_grace: float = 30.0):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ingest_grace = ingest_grace
+        self.generation = 0
+        self._no_store_until = 0.0
+        self._size = 0
+        self._vecs: Optional[np.ndarray] = None  # (capacity, dim), built once the dimension is known
+        self._expires = np.empty(0, dtype=np.float64)
+        self._values: List[Any] = []
+
+    def _normalize(self, embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _grow(self, dim: int) -> None:
+        capacity = min(self.maxsize, max(64, 2 * len(self._expires)))
+        vecs = np.zeros((capacity, dim), dtype=np.float32)
+        expires = np.full(capacity, -np.inf)
+        if self._vecs is not None:
+            vecs[:self._size] = self._vecs[:self._size]
+            expires[:self._size] = self._expires[:self._size]
+        self._vecs, self._expires = vecs, expires
+        self._values.extend([None] * (capacity - len(self._values)))
+
+    def get(self, embedding: List[float]) -> Optional[Any]:
+        if self._size == 0:
+            return None
+
+        vec = self._normalize(embedding)
+        scores = self._vecs[:self._size] @ vec
+        scores[self._expires[:self._size] <= time.monotonic()] = -np.inf
+        best = int(np.argmax(scores))
+        best_score = float(scores[best])
+
+        if best_score >= self.threshold:
+            if DEBUG_LOGGING:
+                logger.debug("Semantic cache hit (cosine=%.4f)", best_score)
+            return self._values[best]
+        return None
+
+    def set(self, embedding: List[float], value: Any, generation: int) -> None:
+        if generation != self.generation or time.monotonic() < self._no_store_until:
+            if DEBUG_LOGGING:
+                logger.debug("Semantic cache store skipped: cleared since the value was computed")
+            return
+
+        vec = self._normalize(embedding)
+        if self._vecs is None or (self._size == len(self._expires) and self._size < self.maxsize):
+            self._grow(vec.shape[0])
+
+        if self._size < len(self._expires):
+            slot = self._size
+            self._size += 1
+        else:
+            # Full: reuse the earliest-expiring slot (expired first, then oldest)
+            slot = int(np.argmin(self._expires[:self._size]))
+
+        self._vecs[slot] = vec
+        self._expires[slot] = time.monotonic() + self.ttl
+        self._values[slot] = value
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._no_store_until = time.monotonic() + self.ingest_grace
+        self._expires[:self._size] = -np.inf
+        self._values = [None] * len(self._values)
+        self._size = 0
+
+
+search_cache = SemanticCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    maxsize=SEMANTIC_CACHE_MAXSIZE,
+    ttl=SEMANTIC_CACHE_TTL,
+    ingest_grace=SEMANTIC_CACHE_INGEST_GRACE,
+)
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import List, Optional
 from pydantic import BaseModel, HttpUrl
 
@@ -5,6 +6,17 @@ class IngestYouTubeRequest(BaseModel):
     urls: List[HttpUrl]
 
 
+@dataclass(slots=True)
+class IngestResult:
+    """Per-URL outcome of an ingestion run."""
+    url: str
+    status: str  # "ok" | "error"
+    chunks: int = 0
+    error: str = ""
+    error_type: str = ""
+    error_details: str = ""
+
+
 class SearchResponseItem(BaseModel):
     score: float
     title: str
@@ -1,9 +1,11 @@
+import asyncio
 import os
-from typing import List, Dict, Any
+from typing import List, Optional, Tuple
 
 from langchain.schema import Document
 
-from store import vs
+from data_models import IngestResult
+from store import get_vector_store
 from yt import _get_video_metadata, _fetch_youtube_transcript_chunks
 from settings import logger, DEBUG_LOGGING
 
@@ -15,96 +17,153 @@ from settings import logger, DEBUG_LOGGING
 # - "source": "youtube_api" | "md_estimated"
 # - "raw_path": str
 
-def ingest_youtube_urls(urls: List[str]) -> List[Dict[str, Any]]:
-    logger.info(f"Starting ingestion of {len(urls)} YouTube URLs")
-    if DEBUG_LOGGING:
-        logger.debug(f"URLs to ingest: {urls}")
+# Chunks per vector store call; stays well under OpenAI's 2048-input embedding limit
+EMBED_BATCH_SIZE = 512
+
+# Caps how many URLs hit YouTube at once (across requests), so the per-call
+# delays in _fetch_youtube_transcript_chunks still keep us clear of 429s
+_youtube_semaphore = asyncio.Semaphore(3)
+
+def _fetch_one(url: str, index: int, total: int) -> Tuple[Optional[IngestResult], List[Document]]:
+    """
+    Fetch metadata and transcript chunks for one URL.
+    Returns (error_result, []) on failure or (None, chunks) on success.
+    """
+    logger.info("Processing URL %s/%s: %s", index+1, total, url)
+    try:
+        # Step 1: Get video metadata
+        try:
+            logger.info("Fetching metadata for URL: %s", url)
+            vid, duration, title = _get_video_metadata(url)
+            logger.info("Successfully fetched metadata: video_id=%s, duration=%ss, title='%s'", vid, duration, title)
+        except Exception as e:
+            logger.error("Failed to fetch metadata for URL: %s. Error: %s", url, e)
+            return IngestResult(
+                url=url,
+                status="error",
+                error=str(e),
+                error_type="metadata_fetch_failed",
+                error_details="Failed to fetch video metadata. The video might be unavailable or restricted."
+            ), []
 
-    results = []
-    for i, url in enumerate(urls):
-        logger.info(f"Processing URL {i+1}/{len(urls)}: {url}")
+        # Step 2: Get transcript chunks
         try:
-            # Step 1: Get video metadata
-            try:
-                logger.info(f"Fetching metadata for URL: {url}")
-                vid, duration, title = _get_video_metadata(url)
-                logger.info(f"Successfully fetched metadata: video_id={vid}, duration={duration}s, title='{title}'")
-            except Exception as e:
-                error_msg = f"Failed to fetch metadata for URL: {url}. Error: {str(e)}"
-                logger.error(error_msg)
-                results.append({
-                    "url": url, 
-                    "status": "error", 
-                    "error": str(e),
-                    "error_type": "metadata_fetch_failed",
-                    "error_details": "Failed to fetch video metadata. The video might be unavailable or restricted."
-                })
-                continue
-
-            # Step 2: Get transcript chunks
-            try:
-                logger.info(f"Fetching transcript for video_id: {vid}")
-                transcript_chunks = _fetch_youtube_transcript_chunks(vid, url, title)
-                if not transcript_chunks:
-                    error_msg = f"No transcript available for video_id: {vid}"
-                    logger.error(error_msg)
-                    results.append({
-                        "url": url, 
-                        "status": "error", 
-                        "error_type": "no_transcript",
-                        "error_details": "No transcript available for this video. It might be private, age-restricted, or have no captions."
-                    })
-                    continue
-                logger.info(f"Successfully fetched and chunked transcript: {len(transcript_chunks)} chunks")
-
-                if DEBUG_LOGGING:
-                    logger.debug(f"Transcript chunk details for {url}:")
-                    for i, chunk in enumerate(transcript_chunks[:3]):  # Log first 3 chunks as sample
-                        logger.debug(f"  Chunk {i+1} start: {chunk.metadata.get('start_seconds')}s")
-                        logger.debug(f"  Chunk {i+1} length: {len(chunk.page_content)} chars")
-                    if len(transcript_chunks) > 3:
-                        logger.debug(f"  ... and {len(transcript_chunks) - 3} more chunks")
-            except Exception as e:
-                error_msg = f"Failed to fetch transcript for video_id: {vid}. Error: {str(e)}"
-                logger.error(error_msg)
-                results.append({
-                    "url": url, 
-                    "status": "error", 
-                    "error": str(e),
-                    "error_type": "transcript_fetch_failed",
-                    "error_details": "Failed to fetch video transcript. The video might be unavailable or have no captions."
-                })
-                continue
-
-            # Step 3: Add to vector store
-            try:
-                logger.info(f"Adding {len(transcript_chunks)} chunks to vector store for URL: {url}")
-                vs.add_documents(transcript_chunks)
-                logger.info(f"Successfully added {len(transcript_chunks)} chunks to vector store for URL: {url}")
-                results.append({"url": url, "status": "ok", "chunks": len(transcript_chunks)})
-            except Exception as e:
-                error_msg = f"Failed to add chunks to vector store for URL: {url}. Error: {str(e)}"
-                logger.error(error_msg)
-                results.append({
-                    "url": url, 
-                    "status": "error", 
-                    "error": str(e),
-                    "error_type": "embedding_failed",
-                    "error_details": "Failed to create embeddings. Check your OpenAI API key format in .env file."
-                })
+            logger.info("Fetching transcript for video_id: %s", vid)
+            transcript_chunks = _fetch_youtube_transcript_chunks(vid, url, title)
+            if not transcript_chunks:
+                logger.error("No transcript available for video_id: %s", vid)
+                return IngestResult(
+                    url=url,
+                    status="error",
+                    error_type="no_transcript",
+                    error_details="No transcript available for this video. It might be private, age-restricted, or have no captions."
+                ), []
+            logger.info("Successfully fetched and chunked transcript: %s chunks", len(transcript_chunks))
+
+            if DEBUG_LOGGING:
+                logger.debug("Transcript chunk details for %s:", url)
+                for i, chunk in enumerate(transcript_chunks[:3]):  # Log first 3 chunks as sample
+                    logger.debug("  Chunk %s start: %ss", i+1, chunk.metadata.get('start_seconds'))
+                    logger.debug("  Chunk %s length: %s chars", i+1, len(chunk.page_content))
+                if len(transcript_chunks) > 3:
+                    logger.debug("  ... and %s more chunks", len(transcript_chunks) - 3)
         except Exception as e:
-            error_msg = f"Unexpected error processing URL: {url}. Error: {str(e)}"
-            logger.error(error_msg)
-            results.append({
-                "url": url, 
-                "status": "error", 
-                "error": str(e),
-                "error_type": "unknown_error",
-                "error_details": "An unexpected error occurred during processing."
-            })
-
-    logger.info(f"Completed ingestion of {len(urls)} YouTube URLs")
-    success_count = len([r for r in results if r.get("status") == "ok"])
-    logger.info(f"Successfully processed {success_count}/{len(urls)} URLs")
+            logger.error("Failed to fetch transcript for video_id: %s. Error: %s", vid, e)
+            return IngestResult(
+                url=url,
+                status="error",
+                error=str(e),
+                error_type="transcript_fetch_failed",
+                error_details="Failed to fetch video transcript. The video might be unavailable or have no captions."
+            ), []
+
+        return None, transcript_chunks
+    except Exception as e:
+        logger.error("Unexpected error processing URL: %s. Error: %s", url, e)
+        return _unexpected_error(url, e), []
+
+
+def _unexpected_error(url: str, e: BaseException) -> IngestResult:
+    return IngestResult(
+        url=url,
+        status="error",
+        error=str(e),
+        error_type="unknown_error",
+        error_details="An unexpected error occurred during processing."
+    )
+
+
+def _add_in_batches(docs: List[Document]) -> List[Tuple[int, int, Exception]]:
+    """
+    Add docs to the vector store in slices of EMBED_BATCH_SIZE.
+    Returns the (start, end, error) index ranges of any slices that failed.
+    """
+    failed = []
+    for lo in range(0, len(docs), EMBED_BATCH_SIZE):
+        batch = docs[lo:lo + EMBED_BATCH_SIZE]
+        try:
+            get_vector_store().add_documents(batch)
+        except Exception as e:
+            logger.error("Failed to add chunks %s-%s to vector store. Error: %s", lo, lo + len(batch), e)
+            failed.append((lo, lo + len(batch), e))
+    return failed
+
+
+async def _fetch_one_limited(url: str, index: int, total: int) -> Tuple[Optional[IngestResult], List[Document]]:
+    async with _youtube_semaphore:
+        return await asyncio.to_thread(_fetch_one, url, index, total)
+
+
+async def ingest_youtube_urls(urls: List[str]) -> List[IngestResult]:
+    logger.info("Starting ingestion of %s YouTube URLs", len(urls))
+    if DEBUG_LOGGING:
+        logger.debug("URLs to ingest: %s", urls)
+
+    # The per-URL work is blocking network I/O (yt-dlp, transcript API),
+    # so fan it out to worker threads, a few URLs at a time
+    tasks = [_fetch_one_limited(url, i, len(urls)) for i, url in enumerate(urls)]
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+    results: List[Optional[IngestResult]] = [None] * len(urls)
+    all_chunks: List[Document] = []
+    chunk_ranges: List[Tuple[int, int, int]] = []  # (url index, start, end) into all_chunks
+    for i, (url, outcome) in enumerate(zip(urls, outcomes)):
+        if isinstance(outcome, BaseException):
+            logger.error("Unexpected error processing URL: %s. Error: %s", url, outcome)
+            results[i] = _unexpected_error(url, outcome)
+            continue
+        error, transcript_chunks = outcome
+        if error is not None:
+            results[i] = error
+            continue
+        chunk_ranges.append((i, len(all_chunks), len(all_chunks) + len(transcript_chunks)))
+        all_chunks.extend(transcript_chunks)
+
+    # Step 3: Add every URL's chunks to the vector store together, so embeddings
+    # go out in a few large requests instead of one small request per URL
+    failed: List[Tuple[int, int, Exception]] = []
+    if all_chunks:
+        logger.info("Adding %s chunks from %s URLs to vector store", len(all_chunks), len(chunk_ranges))
+        failed = await asyncio.to_thread(_add_in_batches, all_chunks)
+
+    for i, start, end in chunk_ranges:
+        url = urls[i]
+        error = next((e for lo, hi, e in failed if start < hi and lo < end), None)
+        if error is None:
+            logger.info("Successfully added %s chunks to vector store for URL: %s", end - start, url)
+            results[i] = IngestResult(url=url, status="ok", chunks=end - start)
+        else:
+            logger.error("Failed to add chunks to vector store for URL: %s. Error: %s", url, error)
+            results[i] = IngestResult(
+                url=url,
+                status="error",
+                error=str(error),
+                error_type="embedding_failed",
+                error_details="Failed to create embeddings. Check your OpenAI API key format in .env file."
+            )
+
+    logger.info("Completed ingestion of %s YouTube URLs", len(urls))
+    success_count = len([r for r in results if r.status == "ok"])
+    logger.info("Successfully processed %s/%s URLs", success_count, len(urls))
 
     return results
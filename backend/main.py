@@ -1,16 +1,34 @@
 from fastapi import FastAPI, Query, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from typing import List
+import asyncio
+import logging
 import time
 
 from data_models import IngestYouTubeRequest, SearchResponse, SearchResponseItem
-from store import vs
+from store import get_vector_store
+from cache import search_cache
 from ingest import ingest_youtube_urls
 from utils import seconds_to_hms
-from settings import logger, DEBUG_LOGGING
-from agent import generate_response
+from settings import logger, DEBUG_LOGGING, SEMANTIC_CACHE_ENABLED, API_HOST, API_PORT, API_WORKERS
+from agent import generate_response, close_http_clients, FALLBACK_RESPONSE
 
-app = FastAPI(title="Podcast RAG API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_http_clients()
+
+
+app = FastAPI(
+    title="Podcast RAG API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -27,22 +45,23 @@ async def log_requests(request: Request, call_next):
     start_time = time.time()
 
     # Log the request
-    logger.info(f"Request: {request.method} {request.url.path}")
-    if DEBUG_LOGGING:
-        logger.debug(f"Request headers: {request.headers}")
+    logger.info("Request: %s %s", request.method, request.url.path)
+    # Only buffer the body when it will actually be logged
+    if DEBUG_LOGGING and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Request headers: %s", request.headers)
         body = await request.body()
         if body:
             try:
-                logger.debug(f"Request body: {body.decode()}")
+                logger.debug("Request body: %s", body.decode())
             except:
-                logger.debug(f"Request body: {body} (binary)")
+                logger.debug("Request body: %s (binary)", body)
 
     # Process the request
     response = await call_next(request)
 
     # Log the response
     process_time = time.time() - start_time
-    logger.info(f"Response: {request.method} {request.url.path} - Status: {response.status_code} - Time: {process_time:.3f}s")
+    logger.info("Response: %s %s - Status: %s - Time: %.3fs", request.method, request.url.path, response.status_code, process_time)
 
     return response
 
@@ -52,68 +71,86 @@ def health():
     return {"ok": True}
 
 @app.post("/ingest/youtube")
-def ingest_youtube(req: IngestYouTubeRequest):
+async def ingest_youtube(req: IngestYouTubeRequest):
     url_count = len(req.urls)
-    logger.info(f"Ingesting {url_count} YouTube URLs")
+    logger.info("Ingesting %s YouTube URLs", url_count)
 
     if DEBUG_LOGGING:
         for i, url in enumerate(req.urls):
-            logger.debug(f"URL {i+1}: {url}")
+            logger.debug("URL %s: %s", i+1, url)
 
     try:
-        results = ingest_youtube_urls([str(u) for u in req.urls])
+        results = await ingest_youtube_urls([str(u) for u in req.urls])
 
         # Log summary of results
-        success_count = len([r for r in results if r.get("status") == "ok"])
-        logger.info(f"YouTube ingestion completed: {success_count}/{url_count} URLs successful")
+        success_count = len([r for r in results if r.status == "ok"])
+        logger.info("YouTube ingestion completed: %s/%s URLs successful", success_count, url_count)
+
+        # New content can change search answers, so drop cached ones
+        if success_count:
+            search_cache.clear()
 
         if DEBUG_LOGGING:
             for result in results:
-                status = result.get("status")
-                url = result.get("url", "Unknown URL")
-                if status == "ok":
-                    logger.debug(f"Success for {url}: {result.get('chunks')} chunks")
+                if result.status == "ok":
+                    logger.debug("Success for %s: %s chunks", result.url, result.chunks)
                 else:
-                    logger.debug(f"Failed for {url}: {result.get('error_type')} - {result.get('error_details')}")
+                    logger.debug("Failed for %s: %s - %s", result.url, result.error_type, result.error_details)
 
         # If all URLs failed, return a 400 Bad Request status
         if success_count == 0 and url_count > 0:
             error_details = [
                 {
-                    "url": r.get("url", "Unknown URL"),
-                    "error_type": r.get("error_type", "unknown_error"),
-                    "error_details": r.get("error_details", "Unknown error")
+                    "url": r.url,
+                    "error_type": r.error_type or "unknown_error",
+                    "error_details": r.error_details or "Unknown error"
                 }
-                for r in results if r.get("status") == "error"
+                for r in results if r.status == "error"
             ]
-            logger.error(f"All {url_count} URLs failed to process")
+            logger.error("All %s URLs failed to process", url_count)
             raise HTTPException(
                 status_code=400,
                 detail={
                     "message": "Failed to process all YouTube URLs",
                     "errors": error_details,
-                    "results": results
+                    "results": [asdict(r) for r in results]
                 }
             )
 
         return {"results": results}
     except Exception as e:
-        logger.error(f"Error in YouTube ingestion endpoint: {str(e)}")
+        logger.error("Error in YouTube ingestion endpoint: %s", e)
         raise
 
 
 @app.get("/search", response_model=SearchResponse)
-def search(q: str = Query(..., description="User query")):
-    logger.info(f"Searching for: '{q}'")
+async def search(q: str = Query(..., description="User query")):
+    logger.info("Searching for: '%s'", q)
 
     try:
+        # First call builds the OpenAI/Pinecone clients, so keep it off the event loop
+        store = await asyncio.to_thread(get_vector_store)
+
+        # Embed the query once: it is the semantic cache key and is reused for the search itself
+        embedding = None
+        if SEMANTIC_CACHE_ENABLED:
+            embedding = await asyncio.to_thread(store.embed_query, q)
+            cached = search_cache.get(embedding)
+            if cached is not None:
+                logger.info("Serving search for '%s' from semantic cache", q)
+                return cached.model_copy(update={"query": q})
+
+        # Snapshot before searching; an ingest that finishes meanwhile makes this result stale
+        cache_generation = search_cache.generation
+
         start_time = time.time()
-        pairs = vs.search(q)  # k parameter is handled in the search method
+        pairs = await asyncio.to_thread(store.search, q, embedding)  # k parameter is handled in the search method
         search_time = time.time() - start_time
 
-        logger.info(f"Search returned {len(pairs)} results in {search_time:.3f}s")
+        logger.info("Search returned %s results in %.3fs", len(pairs), search_time)
 
         results: List[SearchResponseItem] = []
+        ai_tasks = []
         for doc, score in pairs:
             meta = doc.metadata or {}
             title = str(meta.get("title") or "Untitled")
@@ -122,33 +159,58 @@ def search(q: str = Query(..., description="User query")):
             # Start the video 8 seconds before the retrieved timestamp to ease in
             start_seconds = max(0, original_start_seconds - 8)
 
-            # Generate AI response for this result
-            snippet_text = doc.page_content[:800] + ("..." if len(doc.page_content) > 800 else "")
-            ai_response = generate_response(
+            pc = doc.page_content
+            pc_len = len(pc)
+
+            # Queue the AI response for this result; all of them are generated together below
+            snippet_text = pc[:800] + "..." if pc_len > 800 else pc
+            ai_tasks.append(generate_response(
                 query=q,
                 title=title,
                 snippet=snippet_text
-            )
+            ))
 
-            # Create the response item with the generated response
             results.append(
                 SearchResponseItem(
                     score=float(score),
                     title=title,
-                    snippet=doc.page_content[:400] + ("..." if len(doc.page_content) > 400 else ""),
+                    snippet=pc[:400] + "..." if pc_len > 400 else pc,
                     video_url=video_url,
                     start_seconds=start_seconds,
                     start_hms=seconds_to_hms(start_seconds),
-                    ai_response=ai_response,
                 )
             )
 
             if DEBUG_LOGGING:
-                logger.debug(f"Result: score={score:.4f}, title='{title}', start={start_seconds}s")
+                logger.debug("Result: score=%.4f, title='%s', start=%ss", score, title, start_seconds)
                 if video_url:
-                    logger.debug(f"  video_url: {video_url}")
-
-        return SearchResponse(query=q, results=results)
+                    logger.debug("  video_url: %s", video_url)
+
+        # Run the LLM calls concurrently instead of one round-trip per result
+        ai_responses = await asyncio.gather(*ai_tasks, return_exceptions=True)
+        ai_failed = False
+        for item, ai_response in zip(results, ai_responses):
+            if isinstance(ai_response, BaseException):
+                logger.error("Error generating AI response for '%s': %s", item.title, ai_response)
+                item.ai_response = FALLBACK_RESPONSE
+                ai_failed = True
+            else:
+                item.ai_response = ai_response
+
+        response = SearchResponse(query=q, results=results)
+        # Don't cache fallback text; the next similar query should retry the LLM
+        if SEMANTIC_CACHE_ENABLED and results and not ai_failed:
+            search_cache.set(embedding, response, cache_generation)
+
+        return response
     except Exception as e:
-        logger.error(f"Error in search endpoint: {str(e)}")
+        logger.error("Error in search endpoint: %s", e)
         raise
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # loop/http "auto" pick uvloop + httptools when installed (not on Windows)
+    # and fall back to the stdlib asyncio loop and h11 otherwise
+    uvicorn.run("main:app", host=API_HOST, port=API_PORT, loop="auto", http="auto", workers=API_WORKERS)
@@ -2,7 +2,11 @@ import os
 import logging
 from dotenv import load_dotenv
 
-load_dotenv()
+# Only read .env once per process, even if this module ends up imported twice
+# (e.g. as both `settings` and `backend.settings`)
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 
 # Configure logging
 DEBUG_LOGGING = os.getenv("DEBUG_LOGGING", "false").lower() in ("true", "1", "yes")
@@ -16,6 +20,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger("podcast-rag")
 
+# API server configuration (used when running `python main.py`)
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# Each worker is a separate process with its own semantic cache (see cache.py)
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
 # API Keys and Service Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY", "")
@@ -25,3 +35,11 @@ INDEX_NAME = os.getenv("INDEX_NAME", "podcast-clips-index")
 WEBSHARE_PROXY_USERNAME = os.getenv("WEBSHARE_PROXY_USERNAME", "")
 WEBSHARE_PROXY_PASSWORD = os.getenv("WEBSHARE_PROXY_PASSWORD", "")
 USE_PROXIES = os.getenv("USE_PROXIES", "false").lower() in ("true", "1", "yes")
+
+# Semantic cache for /search (see cache.py)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_MAXSIZE = int(os.getenv("SEMANTIC_CACHE_MAXSIZE", "2000"))
+# Seconds after an ingest during which /search results are not cached (Pinecone is eventually consistent)
+SEMANTIC_CACHE_INGEST_GRACE = float(os.getenv("SEMANTIC_CACHE_INGEST_GRACE", "30"))
@@ -1,4 +1,5 @@
-from typing import List, Tuple
+import threading
+from typing import List, Optional, Tuple
 from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore, PineconeRerank
 from langchain_core.documents import Document
@@ -26,6 +27,13 @@ class VectorStore:
                 pinecone_api_key=PINECONE_API_KEY
             )
             logger.info("Pinecone vector store initialized successfully")
+
+            self.reranker = PineconeRerank(
+                model="bge-reranker-v2-m3",
+                top_n=1,
+                return_documents=True,
+                pinecone_api_key=PINECONE_API_KEY
+            )
         except Exception as e:
             logger.error(f"Error initializing vector store: {str(e)}")
             raise
@@ -50,11 +58,21 @@ class VectorStore:
             logger.error(f"Error adding documents to vector store: {str(e)}")
             raise
 
-    def search(self, query: str) -> List[Tuple[Document, float]]:
+    def embed_query(self, query: str) -> List[float]:
+        return self.embeddings.embed_query(query)
+
+    def search(self, query: str, embedding: Optional[List[float]] = None) -> List[Tuple[Document, float]]:
+        """
+        Search for the query and rerank to the top result.
+        Pass a precomputed query embedding to skip embedding the query again.
+        """
         try:
             logger.info(f"Searching vector store for: '{query}' (k=20)")
 
-            results = self.store.similarity_search_with_score(query, k=20)
+            if embedding is not None:
+                results = self.store.similarity_search_by_vector_with_score(embedding, k=20)
+            else:
+                results = self.store.similarity_search_with_score(query, k=20)
             logger.info(f"Initial search returned {len(results)} results")
 
             if not results:
@@ -64,13 +82,7 @@ class VectorStore:
             documents = [doc for doc, _ in results]
 
             # Rerank the documents and always return only the top 1
-            reranker = PineconeRerank(
-                model="bge-reranker-v2-m3",
-                top_n=1,
-                return_documents=True,
-                pinecone_api_key=PINECONE_API_KEY
-            )
-            reranked_docs = reranker.compress_documents(list(documents), query=query)
+            reranked_docs = self.reranker.compress_documents(list(documents), query=query)
 
             logger.info(f"Reranking returned {len(reranked_docs)} results")
 
@@ -97,4 +109,18 @@ class VectorStore:
             raise
 
 
-vs = VectorStore()
+_vector_store: Optional[VectorStore] = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """
+    Create the shared VectorStore on first use rather than at import time.
+    Thread-safe, so concurrent cold-start calls build only one set of clients.
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = VectorStore()
+    return _vector_store
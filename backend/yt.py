@@ -1,6 +1,9 @@
 import re
+import threading
 import time
+from collections import OrderedDict
 from typing import Optional, Tuple, List
+import numpy as np
 import yt_dlp
 from langchain_core.documents import Document
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
@@ -13,6 +16,11 @@ from settings import (
 
 YOUTUBE_ID_RE = re.compile(r"(?:v=|/)([0-9A-Za-z_-]{11}).*")
 
+# LRU of (video_id, length_seconds, title), keyed by the video ID yt-dlp returned
+VIDEO_METADATA_CACHE_SIZE = 2048
+_video_metadata_cache: "OrderedDict[str, Tuple[str, int, str]]" = OrderedDict()
+_video_metadata_lock = threading.Lock()
+
 def extract_video_id(url: str) -> Optional[str]:
     logger.debug(f"Extracting video ID from URL: {url}")
     m = YOUTUBE_ID_RE.search(url)
@@ -28,16 +36,40 @@ def extract_video_id(url: str) -> Optional[str]:
 def _get_video_metadata(url: str) -> Tuple[str, int, str]:
     """
     Return (video_id, length_seconds, title) using yt-dlp.
+    Results are cached per video ID, so the same video linked from several
+    URLs is only fetched once.
     """
+    # First extract the video ID to verify the URL format
+    video_id = extract_video_id(url)
+    if not video_id:
+        logger.error(f"Invalid YouTube URL format: {url}")
+        raise ValueError(f"Invalid YouTube URL format: {url}")
+
+    # Entries are keyed by yt-dlp's ID, so a hit means the extracted ID names the same video
+    with _video_metadata_lock:
+        cached = _video_metadata_cache.get(video_id)
+        if cached is not None:
+            _video_metadata_cache.move_to_end(video_id)
+    if cached is not None:
+        logger.debug(f"Using cached metadata for video ID: {video_id}")
+        return cached
+
+    # Fetch with the caller's URL so yt-dlp can correct a mis-extracted ID
+    metadata = _fetch_video_metadata(url, video_id)
+
+    with _video_metadata_lock:
+        _video_metadata_cache[metadata[0]] = metadata
+        _video_metadata_cache.move_to_end(metadata[0])
+        if len(_video_metadata_cache) > VIDEO_METADATA_CACHE_SIZE:
+            _video_metadata_cache.popitem(last=False)
+
+    return metadata
+
+
+def _fetch_video_metadata(url: str, video_id: str) -> Tuple[str, int, str]:
     logger.info(f"Fetching video metadata with yt-dlp for URL: {url}")
 
     try:
-        # First extract the video ID to verify the URL format
-        video_id = extract_video_id(url)
-        if not video_id:
-            logger.error(f"Invalid YouTube URL format: {url}")
-            raise ValueError(f"Invalid YouTube URL format: {url}")
-
         logger.debug(f"Initializing yt-dlp for video ID: {video_id}")
 
         # Configure yt-dlp options
@@ -73,6 +105,38 @@ def _get_video_metadata(url: str) -> Tuple[str, int, str]:
         raise
 
 
+def _chunk_segments(sents: List[Tuple[int, str]], max_chars: int, overlap: int) -> List[Tuple[int, str]]:
+    """
+    Greedily pack (start, text) segments into chunks of at most max_chars,
+    carrying the last `overlap` chars of each chunk into the next one.
+    Chunk boundaries are found with a search over cumulative segment offsets,
+    so each chunk is one slice of a single joined buffer.
+    """
+    if not sents:
+        return []
+
+    starts, texts = zip(*sents)
+    n = len(texts)
+    joined = " ".join(texts)
+    # offsets[i] is where segment i begins in `joined` (each segment plus its separator)
+    lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=n)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    chunks = []
+    a = 0
+    prefix = ""
+    while a < n:
+        # Largest b such that prefix + segments[a:b] fits, always taking at least one segment
+        limit = offsets[a] + max_chars + 1 - len(prefix)
+        b = max(a + 1, int(np.searchsorted(offsets, limit, side="right")) - 1)
+        content = prefix + joined[offsets[a]:offsets[b] - 1]
+        chunks.append((starts[a], content))
+        prefix = content[-overlap:].lstrip() + " "
+        a = b
+
+    return chunks
+
+
 def _fetch_youtube_transcript_chunks(video_id: str, url: str, title: str):
     """
     Pull transcript via YouTubeTranscriptApi and chunk.
@@ -154,45 +218,26 @@ def _fetch_youtube_transcript_chunks(video_id: str, url: str, title: str):
             for i, (start, text) in enumerate(sents[:3]):  # Log first 3 segments as sample
                 logger.debug(f"  Segment {i+1} at {start}s: '{text[:50]}...'")
 
-        chunks = []
-        cur_text = ""
-        cur_start = None
         MAX = 800
         OVERLAP = 120
 
         logger.debug(f"Chunking transcript with MAX={MAX} chars, OVERLAP={OVERLAP} chars")
 
-        def push_chunk():
-            if cur_text:
-                chunks.append((cur_start if cur_start is not None else 0, cur_text.strip()))
-
-        for (start, text) in sents:
-            if not cur_text:
-                cur_text = text
-                cur_start = start
-            elif len(cur_text) + 1 + len(text) <= MAX:
-                cur_text = f"{cur_text} {text}"
-            else:
-                push_chunk()
-                tail = cur_text[-OVERLAP:]
-                cur_text = f"{tail} {text}".strip()
-                cur_start = start
-
-        push_chunk()
+        chunks = _chunk_segments(sents, MAX, OVERLAP)
 
         logger.info(f"Created {len(chunks)} chunks from transcript")
 
-        docs = []
-        for (start_sec, content) in chunks:
-            docs.append(Document(
-                page_content=content,
-                metadata={
-                    "video_url": url,
-                    "title": title,
-                    "start_seconds": int(start_sec),
-                    "source": "youtube_api",
-                }
-            ))
+        # Metadata shared by every chunk of this video; only start_seconds varies
+        metadata_template = {
+            "video_url": url,
+            "title": title,
+            "source": "youtube_api",
+        }
+
+        docs = [
+            Document(page_content=content, metadata={**metadata_template, "start_seconds": start_sec})
+            for (start_sec, content) in chunks
+        ]
 
         logger.info(f"Created {len(docs)} Document objects from chunks")
 